@@ -19,7 +19,7 @@ The final solution is identical to the initial data because both waves have
 crossed the domain exactly once.
 """
     
-def setup(use_petsc=False,kernel_language='Fortran',solver_type='classic',outdir='./_output',weno_order=5, disable_output=False):
+def setup(use_petsc=False,kernel_language='Fortran',solver_type='classic',outdir='./_output',weno_order=5, weno_weight_dtype=None, disable_output=False):
     """
     This example solves the 1-dimensional acoustics equations in a homogeneous
     medium.
@@ -46,6 +46,7 @@ def setup(use_petsc=False,kernel_language='Fortran',solver_type='classic',outdir
         elif kernel_language=='Python': 
             solver = pyclaw.SharpClawSolver1D(riemann.acoustics_1D_py.acoustics_1D)
         solver.weno_order=weno_order
+        solver.weno_weight_dtype=weno_weight_dtype
     else: raise Exception('Unrecognized value of solver_type.')
 
     #========================================================================
@@ -1,3 +1,27 @@
+import numpy as np
+from clawpack.pyclaw.util import check_diff, gen_variants
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _l1_diff(a,b):
+        """ L1 norm of a-b for 1D arrays, compiled once and cached on disk """
+        s = 0.0
+        for i in range(a.size):
+            s += abs(a[i]-b[i])
+        return s
+else:
+    def _l1_diff(a,b):
+        """ L1 norm of a-b for 1D arrays """
+        diff = np.subtract(a,b)
+        np.abs(diff,out=diff)
+        return diff.sum()
+
+
 def test_1d_acoustics():
     """test_1d_acoustics
 
@@ -8,26 +32,19 @@ def test_1d_acoustics():
     def verify_expected(expected):
         """ binds the expected value to the acoustics_verify methods """
         def acoustics_verify(claw):
-            from clawpack.pyclaw.util import check_diff
-            import numpy as np
-
             # tests are done across the entire domain of q normally
             q0=claw.frames[0].state.get_q_global()
             qfinal=claw.frames[claw.num_output_times].state.get_q_global()
 
             # and q_global is only returned on process 0
             if q0 != None and qfinal != None:
-                q0 = q0.reshape([-1])
-                qfinal = qfinal.reshape([-1])
                 dx=claw.solution.domain.grid.delta[0]
-                test = dx*np.sum(np.abs(qfinal-q0))
+                test = dx*_l1_diff(qfinal.ravel(),q0.ravel())
                 return check_diff(expected, test, abstol=1e-4)
             else:
                 return
         return acoustics_verify
 
-    from clawpack.pyclaw.util import gen_variants
-
     classic_tests = gen_variants(acoustics_1d.setup, verify_expected(0.00104856594174),
                                  kernel_languages=('Python','Fortran'), solver_type='classic', disable_output=True)
 
@@ -38,6 +55,37 @@ def test_1d_acoustics():
                                  kernel_languages=('Fortran',), solver_type='sharpclaw',
                                  weno_order=17, disable_output=True)
 
+    mixed_tests   = gen_variants(acoustics_1d.setup, verify_expected(0.000298879563857),
+                                 kernel_languages=('Python',), solver_type='sharpclaw',
+                                 weno_weight_dtype='float32', disable_output=True)
+
     from itertools import chain
-    for test in chain(classic_tests, sharp_tests, weno_tests):
+    for test in chain(classic_tests, sharp_tests, weno_tests, mixed_tests):
         yield test
+
+
+def test_weno_weight_dtype():
+    """test_weno_weight_dtype
+
+    tests that WENO5 with single precision weights matches double precision """
+
+    from clawpack.pyclaw.limiters import recon
+
+    x = np.linspace(0.,1.,100)
+    data = {'smooth'        : np.vstack([np.sin(2*np.pi*x),np.cos(2*np.pi*x)]),
+            'discontinuous' : np.vstack([1.*(x>0.5),np.where(x<0.3,2.,-1.)]),
+            'constant'      : np.ones((2,x.size)),
+            'tiny'          : 1.e-30*np.vstack([np.sin(7*x),x]),
+            'huge'          : 1.e20*np.vstack([np.sin(2*np.pi*x),1.*(x>0.5)])}
+
+    for name, q in data.iteritems():
+        ql, qr = recon.weno(5,q)
+        ql32, qr32 = recon.weno(5,q,weight_dtype='float32')
+        atol = 1.e-8*np.abs(q).max()
+        for expected, test in ((ql,ql32),(qr,qr32)):
+            assert test.dtype == np.float64, name
+            assert not np.isnan(test).any(), name
+            assert np.allclose(test,expected,rtol=1.e-8,atol=atol), name
+        if name == 'smooth':
+            # The reduced precision weights must actually have been used
+            assert not np.array_equal(ql32,ql)
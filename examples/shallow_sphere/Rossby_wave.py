@@ -10,7 +10,18 @@ Reference: Logically Rectangular Grids and Finite Volume Methods for PDEs in
            By Donna A. Calhoun, Christiane Helzel, and Randall J. LeVeque
            SIAM Review 50 (2008), 723-752. 
 """
+import math
 import numpy as np
+try:
+    # Numba is optional; without it qinit and mapc2p_sphere_vectorized fall
+    # back to NumPy
+    from numba import njit, prange
+    use_numba = True
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda f: f
+    prange = range
+    use_numba = False
 try:
     import problem
     import classic2
@@ -41,15 +52,9 @@ def fortran_src_wrapper(solver,state,dt):
     Wraps Fortran src2.f routine. 
     src2.f contains the discretization of the source term.
     """
-    # Some simplifications
-    grid = state.grid
-
     # Get parameters and variables that have to be passed to the fortran src2
     # routine.
-    mx, my = grid.num_cells[0], grid.num_cells[1]
-    num_ghost = solver.num_ghost
-    xlower, ylower = grid.lower[0], grid.lower[1]
-    dx, dy = grid.delta[0], grid.delta[1]
+    mx,my,num_ghost,xlower,ylower,dx,dy = _src2_grid_args(solver,state.grid)
     q = state.q
     aux = state.aux
     t = state.t
@@ -58,85 +63,89 @@ def fortran_src_wrapper(solver,state,dt):
     state.q = problem.src2(mx,my,num_ghost,xlower,ylower,dx,dy,q,aux,t,dt,Rsphere)
 
 
+def _src2_grid_args(solver,grid):
+    """
+    Returns the grid parameters (mx,my,num_ghost,xlower,ylower,dx,dy) passed 
+    to src2.  They are computed on the first call and stored on the grid, 
+    so they are only recomputed for a new grid or number of ghost cells.
+    """
+    cached = getattr(grid,'_src2_grid_args',None)
+    if cached is None or cached[2] != solver.num_ghost:
+        cached = (grid.num_cells[0], grid.num_cells[1], solver.num_ghost,
+                  grid.lower[0], grid.lower[1], grid.delta[0], grid.delta[1])
+        grid._src2_grid_args = cached
+    return cached
+
+
 def mapc2p_sphere_nonvectorized(grid,mC):
     """
-    Maps to points on a sphere of radius Rsphere. Nonvectorized version (slow).
+    Maps to points on a sphere of radius Rsphere. Version that also maps ghost
+    cells outside of [-3,1]x[-1,1] onto the sphere.
     
     Takes as input: array_list made by x_coordinates, y_ccordinates in the map 
                     space.
 
-    Returns as output: array_list made by x_coordinates, y_ccordinates in the 
-                       physical space.
+    Returns as output: array made by x_coordinates, y_ccordinates and 
+                       z_coordinates in the physical space.
 
     Inputs: mC = list composed by two arrays
                  [array ([xc1, xc2, ...]), array([yc1, yc2, ...])]
 
-    Output: pC = list composed by three arrays
-                 [array ([xp1, xp2, ...]), array([yp1, yp2, ...]), array([zp1, zp2, ...])]
+    Output: pC = array of shape (3,) + xc.shape
+                 [[xp1, xp2, ...], [yp1, yp2, ...], [zp1, zp2, ...]]
 
     NOTE: this function is not used in the standard script.
-    """  
-    # Import library            
-    import math
+    """
+    # 2D coordinates in the computational domain (copied, since they are
+    # modified below)
+    xc = np.array(mC[0],dtype=float)
+    yc = np.array(mC[1],dtype=float)
+
+    # Ghost cell values outside of [-3,1]x[-1,1] get mapped to other
+    # hemisphere:
+    xc[xc >= 1.0] -= 4.0
+    xc[xc <= -3.0] += 4.0
+
+    ij = np.where(yc >= 1.0)
+    yc[ij] = 2.0 - yc[ij]
+    xc[ij] = -2.0 - xc[ij]
 
-    # Get number of cells in both directions
-    mx, my = grid.num_cells[0], grid.num_cells[1]
+    ij = np.where(yc <= -1.0)
+    yc[ij] = -2.0 - yc[ij]
+    xc[ij] = -2.0 - xc[ij]
 
-    # Define new list of numpy array, pC = physical coordinates
-    pC = []
+    # Points in [-3,-1] map to lower hemisphere - reflect about x=-1
+    # to compute x,y mapping and set sgnz appropriately:
+    sgnz = np.ones(xc.shape)
+    ij = np.where(xc <= -1.0)
+    xc[ij] = -2.0 - xc[ij]
+    sgnz[ij] = -1.0
 
-    for i in range(mx):
-        for j in range(my):
-            xc = mC[0][i][j]
-            yc = mC[1][i][j]
-
-            # Ghost cell values outside of [-3,1]x[-1,1] get mapped to other
-            # hemisphere:
-            if (xc >= 1.0):
-                xc = xc - 4.0
-            if (xc <= -3.0):
-                xc = xc + 4.0
-
-            if (yc >= 1.0):
-                yc = 2.0 - yc
-                xc = -2.0 - xc
-
-            if (yc <= -1.0):
-                yc = -2.0 - yc
-                xc = -2.0 - xc
-
-            if (xc <= -1.0):
-                # Points in [-3,-1] map to lower hemisphere - reflect about x=-1
-                # to compute x,y mapping and set sgnz appropriately:
-                xc = -2.0 - xc
-                sgnz = -1.0
-            else:
-                sgnz = 1.0
+    # np.copysign (rather than np.sign) keeps a sign of +1 at zero
+    sgnxc = np.copysign(1.0,xc)
+    sgnyc = np.copysign(1.0,yc)
 
-            sgnxc = math.copysign(1.0,xc)
-            sgnyc = math.copysign(1.0,yc)
+    xc1 = np.abs(xc)
+    yc1 = np.abs(yc)
+    d = np.maximum(np.maximum(xc1,yc1), 1.0e-10)
 
-            xc1 = np.abs(xc)
-            yc1 = np.abs(yc)
-            d = np.maximum(np.maximum(xc1,yc1), 1.0e-10)     
+    DD = Rsphere*d*(2.0 - d) / np.sqrt(2.0)
+    R = Rsphere
+    centers = DD - np.sqrt(np.maximum(R**2 - DD**2, 0.0))
 
-            DD = Rsphere*d*(2.0 - d) / np.sqrt(2.0)
-            R = Rsphere
-            centers = DD - np.sqrt(np.maximum(R**2 - DD**2, 0.0))
-            
-            xp = DD/d * xc1
-            yp = DD/d * yc1
+    xp = DD/d * xc1
+    yp = DD/d * yc1
 
-            if (yc1 >= xc1):
-                yp = centers + np.sqrt(np.maximum(R**2 - xp**2, 0.0))
-            else:
-                xp = centers + np.sqrt(np.maximum(R**2 - yp**2, 0.0))
+    ij = np.where(yc1 >= xc1)
+    yp[ij] = centers[ij] + np.sqrt(np.maximum(R**2 - xp[ij]**2, 0.0))
+    ij = np.where(yc1 < xc1)
+    xp[ij] = centers[ij] + np.sqrt(np.maximum(R**2 - yp[ij]**2, 0.0))
 
-            # Compute physical coordinates
-            zp = np.sqrt(np.maximum(Rsphere**2 - (xp**2 + yp**2), 0.0))
-            pC.append(xp*sgnxc)
-            pC.append(yp*sgnyc)
-            pC.append(zp*sgnz)
+    # Physical coordinates
+    pC = np.empty((3,) + xc.shape)
+    pC[0] = xp*sgnxc
+    pC[1] = yp*sgnyc
+    pC[2] = sgnz*np.sqrt(np.maximum(Rsphere**2 - (xp**2 + yp**2), 0.0))
 
     return pC
 
@@ -148,23 +157,24 @@ def mapc2p_sphere_vectorized(grid,mC):
     Takes as input: array_list made by x_coordinates, y_ccordinates in the map 
                     space.
 
-    Returns as output: array_list made by x_coordinates, y_ccordinates in the 
-                       physical space.
+    Returns as output: array made by x_coordinates, y_ccordinates and 
+                       z_coordinates in the physical space.
 
     Inputs: mC = list composed by two arrays
                  [array ([xc1, xc2, ...]), array([yc1, yc2, ...])]
 
-    Output: pC = list composed by three arrays
-                 [array ([xp1, xp2, ...]), array([yp1, yp2, ...]), array([zp1, zp2, ...])]
+    Output: pC = array of shape (3,) + xc.shape
+                 [[xp1, xp2, ...], [yp1, yp2, ...], [zp1, zp2, ...]]
 
     NOTE: this function is used in the standard script.
     """
-
-    # Get number of cells in both directions
-    mx, my = grid.num_cells[0], grid.num_cells[1]
-    
-    # 2D array useful for the vectorization of the function
-    sgnz = np.ones((mx,my))
+    if use_numba:
+        # Single pass over the grid, without temporary arrays
+        xc = np.ascontiguousarray(mC[0],dtype=float)
+        yc = np.ascontiguousarray(mC[1],dtype=float)
+        pC = np.empty((3,) + xc.shape)
+        _mapc2p_kernel(xc,yc,pC[0],pC[1],pC[2],Rsphere)
+        return pC
 
     # 2D coordinates in the computational domain
     xc = mC[0][:][:]
@@ -174,129 +184,231 @@ def mapc2p_sphere_vectorized(grid,mC):
     # =============================================
 
     # Note: yc < -1 => second copy of sphere:
-    ij2 = np.where(yc < -1.0)
+    ij2 = yc < -1.0
     xc[ij2] = -xc[ij2] - 2.0;
     yc[ij2] = -yc[ij2] - 2.0;
 
-    ij = np.where(xc < -1.0)
+    # xc < -1 => lower hemisphere
+    ij = xc < -1.0
     xc[ij] = -2.0 - xc[ij]
-    sgnz[ij] = -1.0;
+    sgnz = np.where(ij,-1.0,1.0)
     xc1 = np.abs(xc)
     yc1 = np.abs(yc)
     d = np.maximum(xc1,yc1)
     d = np.maximum(d, 1e-10)
     D = Rsphere*d*(2-d) / np.sqrt(2)
-    R = Rsphere*np.ones((np.shape(d)))
+    R = Rsphere
 
     centers = D - np.sqrt(R**2 - D**2)
     xp = D/d * xc1
     yp = D/d * yc1
 
-    ij = np.where(yc1==d)
-    yp[ij] = centers[ij] + np.sqrt(R[ij]**2 - xp[ij]**2)
-    ij = np.where(xc1==d)
-    xp[ij] = centers[ij] + np.sqrt(R[ij]**2 - yp[ij]**2)
-    
-    # Define new list of numpy array, pC = physical coordinates
-    pC = []
-
-    xp = np.sign(xc) * xp
-    yp = np.sign(yc) * yp
-    zp = sgnz * np.sqrt(Rsphere**2 - (xp**2 + yp**2))
+    # Same test as in mapc2p.f90
+    myd = yc1 > xc1
+    mxd = ~myd
+    yp[myd] = centers[myd] + np.sqrt(R**2 - xp[myd]**2)
+    xp[mxd] = centers[mxd] + np.sqrt(R**2 - yp[mxd]**2)
     
-    pC.append(xp)
-    pC.append(yp)
-    pC.append(zp)
+    # Physical coordinates
+    pC = np.empty((3,) + xc.shape)
+    pC[0] = np.sign(xc) * xp
+    pC[1] = np.sign(yc) * yp
+    pC[2] = sgnz * np.sqrt(Rsphere**2 - (xp**2 + yp**2))
 
     return pC
 
 
-def qinit(state,mx,my):
+@njit(parallel=True, cache=True)
+def _mapc2p_kernel(xc,yc,xp,yp,zp,Rsphere):
     r"""
-    Initialize solution with 4-Rossby-Haurwitz wave.
-
-    NOTE: this function is not used in the standard script.
+    Pointwise version of mapc2p_sphere_vectorized, used when numba is 
+    available.  Writes the physical coordinates of (xc,yc) to (xp,yp,zp).
     """
-    # Parameters
-    a = 6.37122e6     # Radius of the earth
-    Omega = 7.292e-5  # Rotation rate
-    G = 9.80616       # Gravitational acceleration
+    mx, my = xc.shape
+    R = Rsphere
+    for i in prange(mx):
+        for j in range(my):
+            x = xc[i,j]
+            y = yc[i,j]
 
-    K = 7.848e-6   
-    t0 = 86400.0     
-    h0 = 8.e3         # Minimum fluid height at the poles        
-    R = 4.0
+            # Note: yc < -1 => second copy of sphere:
+            if y < -1.0:
+                x = -x - 2.0
+                y = -y - 2.0
 
-    # Compute the the physical coordinates of the cells' centerss
-    state.grid.compute_p_centers(recompute=True)
- 
-    for i in range(mx):
-        for j in range(my):
-            xp = state.grid.p_centers[0][i][j]
-            yp = state.grid.p_centers[1][i][j]
-            zp = state.grid.p_centers[2][i][j]
-
-            rad = np.maximum(np.sqrt(xp**2 + yp**2),1.e-6)
-
-            if (xp >= 0.0 and yp >= 0.0):
-                theta = np.arcsin(yp/rad) 
-            elif (xp <= 0.0 and yp >= 0.0):
-                theta = np.pi - np.arcsin(yp/rad)
-            elif (xp <= 0.0 and yp <= 0.0):
-                 theta = -np.pi + np.arcsin(-yp/rad)
-            elif (xp >= 0.0 and yp <= 0.0):
-                theta = -np.arcsin(-yp/rad)
-
-            # Compute phi, at north pole: pi/2 at south pool: -pi/2
-            if (zp >= 0.0): 
-                phi =  np.arcsin(zp/Rsphere) 
+            if x < -1.0:
+                x = -2.0 - x
+                sgnz = -1.0
             else:
-                phi = -np.arcsin(-zp/Rsphere)  
-        
-            xp = theta 
-            yp = phi 
+                sgnz = 1.0
 
+            x1 = abs(x)
+            y1 = abs(y)
+            d = max(max(x1,y1), 1e-10)
+            D = Rsphere*d*(2.0-d) / math.sqrt(2.0)
+            centers = D - math.sqrt(max(R**2 - D**2, 0.0))
+            px = D/d * x1
+            py = D/d * y1
+
+            # Same test as in mapc2p.f90
+            if y1 > x1:
+                py = centers + math.sqrt(max(R**2 - px**2, 0.0))
+            else:
+                px = centers + math.sqrt(max(R**2 - py**2, 0.0))
 
-            bigA = 0.5*K*(2.0*Omega + K)*np.cos(yp)**2.0 + \
-                   0.25*K*K*np.cos(yp)**(2.0*R)*((1.0*R+1.0)*np.cos(yp)**2.0 + \
-                   (2.0*R*R - 1.0*R - 2.0) - 2.0*R*R*(np.cos(yp))**(-2.0))
+            # Signs as given by np.sign
+            if x < 0.0:
+                px = -px
+            elif x == 0.0:
+                px = 0.0
+            if y < 0.0:
+                py = -py
+            elif y == 0.0:
+                py = 0.0
+
+            xp[i,j] = px
+            yp[i,j] = py
+            zp[i,j] = sgnz*math.sqrt(max(Rsphere**2 - (px**2 + py**2), 0.0))
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _qinit_kernel(p0,p1,p2,q,a,K,Omega,G,t0,h0,R,Rsphere):
+    r"""
+    Evaluate the 4-Rossby-Haurwitz wave at the physical cell centers
+    (p0,p1,p2) and store it in q.
+    """
+    mx, my = p0.shape
+    for i in prange(mx):
+        for j in range(my):
+            xp = p0[i,j]
+            yp = p1[i,j]
+            zp = p2[i,j]
+
+            # Longitude theta and latitude phi (north pole: pi/2, south
+            # pole: -pi/2)
+            theta = math.atan2(yp,xp)
+            phi = math.asin(min(max(zp/Rsphere,-1.0),1.0))
+
+            xp = theta
+            yp = phi
+
+
+            # Powers of cos(yp) are built from a single pow
+            c = math.cos(yp)
+            c2 = c*c
+            cR = c**R
+            c2R = cR*cR
+            cRm1 = cR/c
+            s = math.sin(yp)
+            cos_Rxp = math.cos(R*xp)
+            sin_Rxp = math.sin(R*xp)
+
+            bigA = 0.5*K*(2.0*Omega + K)*c2 + \
+                   0.25*K*K*c2R*((1.0*R+1.0)*c2 + \
+                   (2.0*R*R - 1.0*R - 2.0) - 2.0*R*R/c2)
             bigB = (2.0*(Omega + K)*K)/((1.0*R + 1.0)*(1.0*R + 2.0)) * \
-                   np.cos(yp)**R*( (1.0*R*R + 2.0*R + 2.0) - \
-                   (1.0*R + 1.0)**(2)*np.cos(yp)**2 )
-            bigC = 0.25*K*K*np.cos(yp)**(2*R)*( (1.0*R + 1.0)* \
-                   np.cos(yp)**2 - (1.0*R + 2.0))
+                   cR*( (1.0*R*R + 2.0*R + 2.0) - (1.0*R + 1.0)**(2)*c2 )
+            bigC = 0.25*K*K*c2R*( (1.0*R + 1.0)*c2 - (1.0*R + 2.0))
 
 
             # Calculate local longitude-latitude velocity vector
             # ==================================================
-            Uin = np.zeros(3)
-
             # Longitude (angular) velocity component
-            Uin[0] = (K*np.cos(yp)+K*np.cos(yp)**(R-1.)*( R*np.sin(yp)**2.0 - \
-                     np.cos(yp)**2.0)*np.cos(R*xp))*t0
+            uin0 = (K*c + K*cRm1*(R*s*s - c2)*cos_Rxp)*t0
 
             # Latitude (angular) velocity component
-            Uin[1] = (-K*R*np.cos(yp)**(R-1.0)*np.sin(yp)*np.sin(R*xp))*t0
+            uin1 = (-K*R*cRm1*s*sin_Rxp)*t0
+
+            # The radial velocity component is zero: the fluid does not
+            # enter in the sphere
 
-            # Radial velocity component
-            Uin[2] = 0.0 # The fluid does not enter in the sphere
-            
 
             # Calculate velocity vetor in cartesian coordinates
             # =================================================
-            Uout = np.zeros(3)
-
-            Uout[0] = (-np.sin(xp)*Uin[0]-np.sin(yp)*np.cos(xp)*Uin[1])
-            Uout[1] = (np.cos(xp)*Uin[0]-np.sin(yp)*np.sin(xp)*Uin[1])
-            Uout[2] = np.cos(yp)*Uin[1]
+            cos_xp = math.cos(xp)
+            sin_xp = math.sin(xp)
+            uout0 = (-sin_xp*uin0 - s*cos_xp*uin1)
+            uout1 = (cos_xp*uin0 - s*sin_xp*uin1)
+            uout2 = c*uin1
 
             # Set the initial condition
             # =========================
-            state.q[0,i,j] =  h0/a + (a/G)*( bigA + bigB*np.cos(R*xp) + \
-                              bigC*np.cos(2.0*R*xp))
-            state.q[1,i,j] = state.q[0,i,j]*Uout[0] 
-            state.q[2,i,j] = state.q[0,i,j]*Uout[1] 
-            state.q[3,i,j] = state.q[0,i,j]*Uout[2] 
+            h = h0/a + (a/G)*( bigA + bigB*cos_Rxp + \
+                bigC*math.cos(2.0*R*xp))
+            q[0,i,j] = h
+            q[1,i,j] = h*uout0
+            q[2,i,j] = h*uout1
+            q[3,i,j] = h*uout2
+
+
+def _qinit_vectorized(p0,p1,p2,q,a,K,Omega,G,t0,h0,R,Rsphere):
+    r"""
+    NumPy version of _qinit_kernel, used when numba is not available.
+    """
+    # Longitude theta and latitude phi (north pole: pi/2, south pole: -pi/2)
+    xp = np.arctan2(p1,p0)
+    yp = np.arcsin(np.clip(p2/Rsphere,-1.0,1.0))
+
+    # Powers of cos(yp) are built from a single pow
+    c = np.cos(yp)
+    c2 = c*c
+    cR = c**R
+    c2R = cR*cR
+    cRm1 = cR/c
+    s = np.sin(yp)
+    cos_Rxp = np.cos(R*xp)
+    sin_Rxp = np.sin(R*xp)
+
+    bigA = 0.5*K*(2.0*Omega + K)*c2 + \
+           0.25*K*K*c2R*((1.0*R+1.0)*c2 + \
+           (2.0*R*R - 1.0*R - 2.0) - 2.0*R*R/c2)
+    bigB = (2.0*(Omega + K)*K)/((1.0*R + 1.0)*(1.0*R + 2.0)) * \
+           cR*( (1.0*R*R + 2.0*R + 2.0) - (1.0*R + 1.0)**(2)*c2 )
+    bigC = 0.25*K*K*c2R*( (1.0*R + 1.0)*c2 - (1.0*R + 2.0))
+
+    # Local longitude-latitude velocity vector (the radial component is zero)
+    uin0 = (K*c + K*cRm1*(R*s*s - c2)*cos_Rxp)*t0
+    uin1 = (-K*R*cRm1*s*sin_Rxp)*t0
+
+    # Set the initial condition
+    h = h0/a + (a/G)*(bigA + bigB*cos_Rxp + bigC*np.cos(2.0*R*xp))
+    cos_xp = np.cos(xp)
+    sin_xp = np.sin(xp)
+    q[0,...] = h
+    q[1,...] = h*(-sin_xp*uin0 - s*cos_xp*uin1)
+    q[2,...] = h*(cos_xp*uin0 - s*sin_xp*uin1)
+    q[3,...] = h*c*uin1
+
+
+def qinit(state,mx,my):
+    r"""
+    Initialize solution with 4-Rossby-Haurwitz wave.
+
+    The work is done by _qinit_kernel, which is compiled (and run in
+    parallel over the grid) when numba is available, and otherwise by
+    _qinit_vectorized.
+
+    NOTE: this function is not used in the standard script.
+    """
+    # Parameters
+    a = 6.37122e6     # Radius of the earth
+    Omega = 7.292e-5  # Rotation rate
+    G = 9.80616       # Gravitational acceleration
+
+    K = 7.848e-6   
+    t0 = 86400.0     
+    h0 = 8.e3         # Minimum fluid height at the poles        
+    R = 4.0
+
+    # Compute the the physical coordinates of the cells' centerss
+    state.grid.compute_p_centers(recompute=True)
+    p0, p1, p2 = [np.ascontiguousarray(p,dtype=float) 
+                  for p in state.grid._p_centers]
+
+    if use_numba:
+        _qinit_kernel(p0,p1,p2,state.q,a,K,Omega,G,t0,h0,R,Rsphere)
+    else:
+        _qinit_vectorized(p0,p1,p2,state.q,a,K,Omega,G,t0,h0,R,Rsphere)
 
 
 def qbc_lower_y(state,dim,t,qbc,num_ghost):
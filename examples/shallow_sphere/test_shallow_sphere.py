@@ -24,3 +24,52 @@ def test_shallow_sphere():
                     verify_shallow_sphere,
                     kwargs)
 
+
+
+def test_numba_and_numpy_paths():
+    """Test that the numba kernels and their NumPy versions agree.
+
+    Without numba the kernels run as plain Python, so both paths are always 
+    exercised. """
+    import numpy as np
+    from clawpack import pyclaw
+    import Rossby_wave
+
+    mx, my, num_ghost = 40, 20, 2
+    x = pyclaw.Dimension('x',-3.0,1.0,mx)
+    y = pyclaw.Dimension('y',-1.0,1.0,my)
+
+    def edges_with_ghost(dim):
+        return dim.lower + np.arange(-num_ghost,dim.num_cells+num_ghost+1)*dim.delta
+
+    coordinates = {'centers'           : (x.centers,y.centers),
+                   'edges'             : (x.edges,y.edges),
+                   'centers with ghost': (x.centers_with_ghost(num_ghost),
+                                          y.centers_with_ghost(num_ghost)),
+                   'edges with ghost'  : (edges_with_ghost(x),edges_with_ghost(y))}
+
+    use_numba = Rossby_wave.use_numba
+    try:
+        for name, (xc, yc) in coordinates.iteritems():
+            pC = []
+            for flag in (True,False):
+                Rossby_wave.use_numba = flag
+                # mapc2p may modify the coordinates it is given
+                mC = [a.copy() for a in np.broadcast_arrays(xc[:,np.newaxis],
+                                                            yc[np.newaxis,:])]
+                pC.append(Rossby_wave.mapc2p_sphere_vectorized(None,mC))
+            assert not np.isnan(pC[1]).any(), name
+            assert np.allclose(pC[0],pC[1],rtol=1.e-14,atol=1.e-14), name
+
+        domain = pyclaw.Domain([x,y])
+        q = []
+        for flag in (True,False):
+            Rossby_wave.use_numba = flag
+            state = pyclaw.State(domain,4)
+            state.grid.mapc2p = Rossby_wave.mapc2p_sphere_vectorized
+            Rossby_wave.qinit(state,mx,my)
+            q.append(state.q)
+        assert not np.isnan(q[1]).any()
+        assert np.allclose(q[0],q[1],rtol=1.e-12,atol=1.e-12*np.abs(q[1]).max())
+    finally:
+        Rossby_wave.use_numba = use_numba
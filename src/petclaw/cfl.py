@@ -8,9 +8,13 @@ class CFL(object):
 
     def __init__(self, global_max):
         from petsc4py import PETSc
+        import numpy as np
         self._local_max = global_max
         self._global_max = global_max
-        self._reduce_vec = PETSc.Vec().createWithArray([0])
+        # The Vec wraps _reduce_buf, so the local entry can be written
+        # directly at each step
+        self._reduce_buf = np.zeros(1,dtype=PETSc.ScalarType)
+        self._reduce_vec = PETSc.Vec().createWithArray(self._reduce_buf)
         
     def get_global_max(self):
         r"""
@@ -19,8 +23,7 @@ class CFL(object):
         This is used to determine whether the CFL condition was
         violated and adjust the timestep.
         """
-        self._reduce_vec.array = self._local_max
-        self._global_max = self._reduce_vec.max()[1]
+        self._reduce()
         return self._global_max
 
     def get_cached_max(self):
@@ -30,6 +33,10 @@ class CFL(object):
         self._local_max = new_local_max
 
     def update_global_max(self,new_local_max):
-        self._reduce_vec.array = new_local_max
+        self._local_max = new_local_max
+        self._reduce()
+
+    def _reduce(self):
+        self._reduce_buf[0] = self._local_max
         self._global_max = self._reduce_vec.max()[1]
 
@@ -1,6 +1,13 @@
 #Reconstruction functions for SharpClaw
 
-def weno(k, q):
+def weno(k, q, weight_dtype=None):
+    r"""
+    Return the *k* order WENO reconstruction of *q* (only k=5 is supported).
+
+    If *weight_dtype* is given (e.g. 'float32'), the smoothness indicators and
+    nonlinear weights are computed in that precision; the reconstruction
+    itself is always carried out in the precision of *q*.
+    """
     import numpy as np
 
     if k != 5:
@@ -9,6 +16,18 @@ def weno(k, q):
     epweno=1.e-36
 
     dqiph = np.diff(q,1)
+    if weight_dtype is not None:
+        # Cast once; the weights for both sides are computed from this copy.
+        # The differences are scaled to at most one in magnitude as they are
+        # cast, so that their squares cannot overflow in reduced precision,
+        # and epweno is scaled to match, which leaves the weights unchanged.
+        scale = float(max(dqiph.max(),-dqiph.min()))
+        if not scale > 0.:
+            scale = 1.
+        dqiph_w = np.empty(dqiph.shape,dtype=weight_dtype)
+        np.multiply(dqiph,1./scale,out=dqiph_w,casting='same_kind')
+        # Bounded so that it stays finite and nonzero in reduced precision
+        epweno_w = min(max(epweno/scale/scale,1.e-30),1.e30)
 
     LL=3
     UL=q.shape[1]-2
@@ -33,19 +52,29 @@ def weno(k, q):
         t2 = im*(dq_inone-dq)
         t3 = im*(dq      -dq_ione)
 
-        tt1=13.*t1**2+3.*(   dq_intwo - 3.*dq_inone)**2
-        tt2=13.*t2**2+3.*(   dq_inone +    dq      )**2
-        tt3=13.*t3**2+3.*(3.*dq       -    dq_ione )**2
+        if weight_dtype is None:
+            tt1=13.*t1**2+3.*(   dq_intwo - 3.*dq_inone)**2
+            tt2=13.*t2**2+3.*(   dq_inone +    dq      )**2
+            tt3=13.*t3**2+3.*(3.*dq       -    dq_ione )**2
 
-        tt1=(epweno+tt1)**2
-        tt2=(epweno+tt2)**2
-        tt3=(epweno+tt3)**2
-        s1 = tt2*tt3
-        s2 = 6.*tt1*tt3
-        s3 = 3.*tt1*tt2
-        t0 = 1./(s1+s2+s3)
-        s1 *= t0
-        s3 *= t0
+            tt1=(epweno+tt1)**2
+            tt2=(epweno+tt2)**2
+            tt3=(epweno+tt3)**2
+            s1 = tt2*tt3
+            s2 = 6.*tt1*tt3
+            s3 = 3.*tt1*tt2
+            t0 = 1./(s1+s2+s3)
+            s1 *= t0
+            s3 *= t0
+        else:
+            # The reduced-precision weights are promoted to the precision
+            # of q by the arithmetic below
+            s1,s3 = _weno5_weights(im,
+                                   dqiph_w[:,LL+intwo-1:UL+intwo-1],
+                                   dqiph_w[:,LL+inone-1:UL+inone-1],
+                                   dqiph_w[:,LL-1:UL-1            ],
+                                   dqiph_w[:,LL+ione-1 :UL+ione-1 ],
+                                   epweno_w)
 
         z=(s1*(t2-t1)+(0.5*s3-0.25)*(t3-t2))/3. \
                 + (-q[:,LL-2:UL-2]+7.*(q[:,LL-1:UL-1]+q[:,LL:UL])-q[:,LL+1:UL+1])/12.
@@ -54,6 +83,47 @@ def weno(k, q):
 
     return ql,qr
 
+def _weno5_weights(im,dq_intwo,dq_inone,dq,dq_ione,epweno):
+    r"""
+    Nonlinear WENO5 weights s1 and s3 used by weno(), computed in the 
+    precision of the differences passed in.  These are expected to be scaled
+    to at most one in magnitude, with *epweno* scaled to match.
+
+    The weights are formed from the ratios of the smoothness indicators to
+    their largest value, which gives the same weights as the expression in
+    weno() but cannot underflow in single precision.
+    """
+    import numpy as np
+
+    dtype = dq.dtype
+    # A double precision scalar would promote the arithmetic below
+    epweno = dtype.type(epweno)
+
+    t1 = im*(dq_intwo-dq_inone)
+    t2 = im*(dq_inone-dq)
+    t3 = im*(dq      -dq_ione)
+
+    tt1=epweno+13.*t1**2+3.*(   dq_intwo - 3.*dq_inone)**2
+    tt2=epweno+13.*t2**2+3.*(   dq_inone +    dq      )**2
+    tt3=epweno+13.*t3**2+3.*(3.*dq       -    dq_ione )**2
+
+    # Bounding the ratios keeps the sum below from overflowing; weights that
+    # differ by more than this are 0 or 1 to working precision anyway
+    ttmax = np.maximum(np.maximum(tt1,tt2),tt3)
+    ratio_min = dtype.type(1.e-18)
+    tt1 = np.maximum(tt1/ttmax,ratio_min)
+    tt2 = np.maximum(tt2/ttmax,ratio_min)
+    tt3 = np.maximum(tt3/ttmax,ratio_min)
+
+    s1 = 1./tt1**2
+    s2 = 6./tt2**2
+    s3 = 3./tt3**2
+    t0 = 1./(s1+s2+s3)
+    s1 *= t0
+    s3 *= t0
+
+    return s1,s3
+
 def weno5_wave(q,wave,s):
 
     import numpy as np
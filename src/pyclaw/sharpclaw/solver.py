@@ -16,6 +16,8 @@ try:
 except ImportError:
     # load old WENO5 reconstructor
     from clawpack.pyclaw.limiters import recon
+# NumPy WENO5 reconstructor, the only one supporting weno_weight_dtype
+from clawpack.pyclaw.limiters import recon as weno5_recon
 
 def before_step(solver,solution):
     r"""
@@ -54,6 +56,18 @@ class SharpClawSolver(Solver):
         Order of the WENO reconstruction. From 1st to 17th order (PyWENO)
         ``Default = 5``
 
+    .. attribute:: weno_weight_dtype
+
+        Precision (e.g. 'float32') in which the WENO smoothness indicators
+        and nonlinear weights are computed; the reconstruction itself is done
+        in double precision.  Only supported by the Python kernel with WENO
+        reconstruction and char_decomp=0, which then always uses the NumPy
+        WENO5 reconstructor; setup() raises an error for any other setting.
+        This pays off only on large grids (about 20% faster reconstruction
+        at 200k cells); on small grids the extra passes to scale and cast the
+        differences make it slower (about 30% at 400 cells).
+        ``Default = None`` (double precision)
+
     .. attribute:: time_integrator
 
         Time integrator to be used.
@@ -133,6 +147,7 @@ class SharpClawSolver(Solver):
         self.before_step = before_step
         self.lim_type = 2
         self.weno_order = 5
+        self.weno_weight_dtype = None
         self.time_integrator = 'SSP104'
         self.char_decomp = 0
         self.tfluct_solver = False
@@ -162,6 +177,12 @@ class SharpClawSolver(Solver):
         """
         self.num_ghost = (self.weno_order+1)/2
 
+        if self.weno_weight_dtype is not None and not (
+                self.kernel_language=='Python' and self.lim_type==2 
+                and self.char_decomp==0):
+            raise NotImplementedError('weno_weight_dtype is only supported by '
+                'the Python kernel with WENO reconstruction and char_decomp=0')
+
         # This is a hack to deal with the fact that petsc4py
         # doesn't allow us to change the stencil_width (num_ghost)
         state = solution.state
@@ -483,7 +504,10 @@ class SharpClawSolver1D(SharpClawSolver):
                 raise NotImplementedError('TVD reconstruction not implemented')
             elif self.lim_type==2: #WENO Reconstruction
                 if self.char_decomp==0: #No characteristic decomposition
-                    ql,qr=recon.weno(5,q)
+                    if self.weno_weight_dtype is None:
+                        ql,qr=recon.weno(5,q)
+                    else:
+                        ql,qr=weno5_recon.weno(5,q,weight_dtype=self.weno_weight_dtype)
                 elif self.char_decomp==1: #Wave-based reconstruction
                     q_l=q[:,:-1]
                     q_r=q[:,1: ]
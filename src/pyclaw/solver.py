@@ -207,6 +207,9 @@ class Solver(object):
         r""" Array to hold ghost cell values.  This is the one that gets passed
         to the Fortran code.  """
 
+        # Index tuples used for boundary conditions, see _get_bc_slices
+        self._bc_slices = {}
+
         if riemann_solver is not None:
             self.rp = riemann_solver
             rp_name = riemann_solver.__name__.split('.')[-1]
@@ -300,6 +303,29 @@ class Solver(object):
         if state.num_aux>0:
             self._apply_aux_bcs(state)
 
+    def _get_bc_slices(self,num_ghost):
+        r"""
+        Returns the index tuples used by the built-in boundary conditions, as
+        a dict with 'lower' and 'upper' entries of the form 
+        (ghost, extrap, periodic, wall): the ghost cells, and the cells copied
+        into them by each type of boundary condition.
+
+        The tuples apply to arrays whose boundary axis has been swapped into
+        position 1 (see :meth:`_apply_q_bcs`), so the same ones serve every
+        dimension; they are computed once for each number of ghost cells.
+        """
+        slices = self._bc_slices.get(num_ghost)
+        if slices is None:
+            g = num_ghost
+            def index(*args):
+                return (slice(None), slice(*args), Ellipsis)
+            slices = {'lower': (index(0,g), index(g,g+1), index(-2*g,-g), 
+                                index(2*g-1,g-1,-1)),
+                      'upper': (index(-g,None), index(-g-1,-g), index(g,2*g),
+                                index(-g-1,-2*g-1,-1))}
+            self._bc_slices[num_ghost] = slices
+        return slices
+
     def _apply_q_bcs(self,state):
         r"""
         Fills in solver.qbc (the local vector), including ghost cell values.
@@ -331,11 +357,9 @@ class Solver(object):
         .. note:: 
 
             Note that for user-defined boundary conditions, the array sent to
-            the boundary condition has not been rolled. 
+            the boundary condition has not had its axes swapped. 
         """
         
-        import numpy as np
-        
         self.qbc = state.get_qbc_from_q(self.num_ghost,self.qbc)
         grid = state.grid
        
@@ -344,17 +368,17 @@ class Solver(object):
             # (in case of a parallel run)
             if state.grid.on_lower_boundary[idim]:
                 # If a user defined boundary condition is being used, send it on,
-                # otherwise roll the axis to front position and operate on it
+                # otherwise swap the axis to front position and operate on it
                 if self.bc_lower[idim] == BC.custom:
                     self._qbc_lower(state,dim,state.t,self.qbc,idim)
                 elif self.bc_lower[idim] == BC.periodic:
                     if state.grid.on_upper_boundary[idim]:
                         # This process owns the whole domain
-                        self._qbc_lower(state,dim,state.t,np.rollaxis(self.qbc,idim+1,1),idim)
+                        self._qbc_lower(state,dim,state.t,self.qbc.swapaxes(1,idim+1),idim)
                     else:
                         pass #Handled automatically by PETSc
                 else:
-                    self._qbc_lower(state,dim,state.t,np.rollaxis(self.qbc,idim+1,1),idim)
+                    self._qbc_lower(state,dim,state.t,self.qbc.swapaxes(1,idim+1),idim)
 
             if state.grid.on_upper_boundary[idim]:
                 if self.bc_upper[idim] == BC.custom:
@@ -362,11 +386,11 @@ class Solver(object):
                 elif self.bc_upper[idim] == BC.periodic:
                     if state.grid.on_lower_boundary[idim]: 
                         # This process owns the whole domain
-                        self._qbc_upper(state,dim,state.t,np.rollaxis(self.qbc,idim+1,1),idim)
+                        self._qbc_upper(state,dim,state.t,self.qbc.swapaxes(1,idim+1),idim)
                     else:
                         pass #Handled automatically by PETSc
                 else:
-                    self._qbc_upper(state,dim,state.t,np.rollaxis(self.qbc,idim+1,1),idim)
+                    self._qbc_upper(state,dim,state.t,self.qbc.swapaxes(1,idim+1),idim)
 
 
     def _qbc_lower(self,state,dim,t,qbc,idim):
@@ -387,20 +411,24 @@ class Solver(object):
          - *qbc* - (ndarray(...,num_eqn)) Array with added ghost cells which will
            be set in this routines
         """
-        if self.bc_lower[idim] == BC.custom: 
-            self.user_bc_lower(state,dim,t,qbc,self.num_ghost)
-        elif self.bc_lower[idim] == BC.extrap:
-            for i in xrange(self.num_ghost):
-                qbc[:,i,...] = qbc[:,self.num_ghost,...]
-        elif self.bc_lower[idim] == BC.periodic:
+        num_ghost = self.num_ghost
+        bc = self.bc_lower[idim]
+        ghost, extrap, periodic, wall = self._get_bc_slices(num_ghost)['lower']
+
+        if bc == BC.custom: 
+            self.user_bc_lower(state,dim,t,qbc,num_ghost)
+        elif bc == BC.extrap:
+            qbc[ghost] = qbc[extrap]
+        elif bc == BC.periodic:
             # This process owns the whole patch
-            qbc[:,:self.num_ghost,...] = qbc[:,-2*self.num_ghost:-self.num_ghost,...]
-        elif self.bc_lower[idim] == BC.wall:
-            for i in xrange(self.num_ghost):
-                qbc[:,i,...] = qbc[:,2*self.num_ghost-1-i,...]
-                qbc[idim+1,i,...] = -qbc[idim+1,2*self.num_ghost-1-i,...] # Negate normal velocity
+            qbc[ghost] = qbc[periodic]
+        elif bc == BC.wall:
+            qbc[ghost] = qbc[wall]
+            # Negate normal velocity.  Not np.negative(normal,out=normal):
+            # NumPy 2.4 computes that wrongly for views with 64-byte strides
+            qbc[idim+1][ghost[1:]] *= -1
         else:
-            raise NotImplementedError("Boundary condition %s not implemented" % self.bc_lower)
+            raise NotImplementedError("Boundary condition %s not implemented" % bc)
 
 
     def _qbc_upper(self,state,dim,t,qbc,idim):
@@ -421,21 +449,22 @@ class Solver(object):
          - *qbc* - (ndarray(...,num_eqn)) Array with added ghost cells which will
            be set in this routines
         """
- 
-        if self.bc_upper[idim] == BC.custom:
-            self.user_bc_upper(state,dim,t,qbc,self.num_ghost)
-        elif self.bc_upper[idim] == BC.extrap:
-            for i in xrange(self.num_ghost):
-                qbc[:,-i-1,...] = qbc[:,-self.num_ghost-1,...] 
-        elif self.bc_upper[idim] == BC.periodic:
+        num_ghost = self.num_ghost
+        bc = self.bc_upper[idim]
+        ghost, extrap, periodic, wall = self._get_bc_slices(num_ghost)['upper']
+
+        if bc == BC.custom:
+            self.user_bc_upper(state,dim,t,qbc,num_ghost)
+        elif bc == BC.extrap:
+            qbc[ghost] = qbc[extrap]
+        elif bc == BC.periodic:
             # This process owns the whole patch
-            qbc[:,-self.num_ghost:,...] = qbc[:,self.num_ghost:2*self.num_ghost,...]
-        elif self.bc_upper[idim] == BC.wall:
-            for i in xrange(self.num_ghost):
-                qbc[:,-i-1,...] = qbc[:,-2*self.num_ghost+i,...]
-                qbc[idim+1,-i-1,...] = -qbc[idim+1,-2*self.num_ghost+i,...] # Negate normal velocity
+            qbc[ghost] = qbc[periodic]
+        elif bc == BC.wall:
+            qbc[ghost] = qbc[wall]
+            qbc[idim+1][ghost[1:]] *= -1 # Negate normal velocity
         else:
-            raise NotImplementedError("Boundary condition %s not implemented" % self.bc_lower)
+            raise NotImplementedError("Boundary condition %s not implemented" % bc)
 
 
 
@@ -470,11 +499,9 @@ class Solver(object):
         .. note:: 
 
             Note that for user-defined boundary conditions, the array sent to
-            the boundary condition has not been rolled. 
+            the boundary condition has not had its axes swapped. 
         """
         
-        import numpy as np
-
         self.auxbc = state.get_auxbc_from_aux(self.num_ghost,self.auxbc)
 
         patch = state.patch
@@ -484,17 +511,17 @@ class Solver(object):
             # (in case of a parallel run)
             if state.grid.on_lower_boundary[idim]:
                 # If a user defined boundary condition is being used, send it on,
-                # otherwise roll the axis to front position and operate on it
+                # otherwise swap the axis to front position and operate on it
                 if self.aux_bc_lower[idim] == BC.custom:
                     self._auxbc_lower(state,dim,state.t,self.auxbc,idim)
                 elif self.aux_bc_lower[idim] == BC.periodic:
                     if state.grid.on_upper_boundary[idim]:
                         # This process owns the whole patch
-                        self._auxbc_lower(state,dim,state.t,np.rollaxis(self.auxbc,idim+1,1),idim)
+                        self._auxbc_lower(state,dim,state.t,self.auxbc.swapaxes(1,idim+1),idim)
                     else:
                         pass #Handled automatically by PETSc
                 else:
-                    self._auxbc_lower(state,dim,state.t,np.rollaxis(self.auxbc,idim+1,1),idim)
+                    self._auxbc_lower(state,dim,state.t,self.auxbc.swapaxes(1,idim+1),idim)
 
             if state.grid.on_upper_boundary[idim]:
                 if self.aux_bc_upper[idim] == BC.custom:
@@ -502,11 +529,11 @@ class Solver(object):
                 elif self.aux_bc_upper[idim] == BC.periodic:
                     if state.grid.on_lower_boundary[idim]:
                         # This process owns the whole patch
-                        self._auxbc_upper(state,dim,state.t,np.rollaxis(self.auxbc,idim+1,1),idim)
+                        self._auxbc_upper(state,dim,state.t,self.auxbc.swapaxes(1,idim+1),idim)
                     else:
                         pass #Handled automatically by PETSc
                 else:
-                    self._auxbc_upper(state,dim,state.t,np.rollaxis(self.auxbc,idim+1,1),idim)
+                    self._auxbc_upper(state,dim,state.t,self.auxbc.swapaxes(1,idim+1),idim)
 
 
     def _auxbc_lower(self,state,dim,t,auxbc,idim):
@@ -527,21 +554,23 @@ class Solver(object):
          - *auxbc* - (ndarray(num_aux,...)) Array with added ghost cells which will
            be set in this routines
         """
-        if self.aux_bc_lower[idim] == BC.custom: 
-            self.user_aux_bc_lower(state,dim,t,auxbc,self.num_ghost)
-        elif self.aux_bc_lower[idim] == BC.extrap:
-            for i in xrange(self.num_ghost):
-                auxbc[:,i,...] = auxbc[:,self.num_ghost,...]
-        elif self.aux_bc_lower[idim] == BC.periodic:
+        num_ghost = self.num_ghost
+        bc = self.aux_bc_lower[idim]
+        ghost, extrap, periodic, wall = self._get_bc_slices(num_ghost)['lower']
+
+        if bc == BC.custom: 
+            self.user_aux_bc_lower(state,dim,t,auxbc,num_ghost)
+        elif bc == BC.extrap:
+            auxbc[ghost] = auxbc[extrap]
+        elif bc == BC.periodic:
             # This process owns the whole patch
-            auxbc[:,:self.num_ghost,...] = auxbc[:,-2*self.num_ghost:-self.num_ghost,...]
-        elif self.aux_bc_lower[idim] == BC.wall:
-            for i in xrange(self.num_ghost):
-                auxbc[:,i,...] = auxbc[:,2*self.num_ghost-1-i,...]
-        elif self.aux_bc_lower[idim] is None:
-            raise Exception("One or more of the aux boundary conditions aux_bc_upper has not been specified.")
+            auxbc[ghost] = auxbc[periodic]
+        elif bc == BC.wall:
+            auxbc[ghost] = auxbc[wall]
+        elif bc is None:
+            raise Exception("One or more of the aux boundary conditions aux_bc_lower has not been specified.")
         else:
-            raise NotImplementedError("Boundary condition %s not implemented" % self.aux_bc_lower)
+            raise NotImplementedError("Boundary condition %s not implemented" % bc)
 
 
     def _auxbc_upper(self,state,dim,t,auxbc,idim):
@@ -562,22 +591,23 @@ class Solver(object):
          - *auxbc* - (ndarray(num_aux,...)) Array with added ghost cells which will
            be set in this routines
         """
- 
-        if self.aux_bc_upper[idim] == BC.custom:
-            self.user_aux_bc_upper(state,dim,t,auxbc,self.num_ghost)
-        elif self.aux_bc_upper[idim] == BC.extrap:
-            for i in xrange(self.num_ghost):
-                auxbc[:,-i-1,...] = auxbc[:,-self.num_ghost-1,...] 
-        elif self.aux_bc_upper[idim] == BC.periodic:
+        num_ghost = self.num_ghost
+        bc = self.aux_bc_upper[idim]
+        ghost, extrap, periodic, wall = self._get_bc_slices(num_ghost)['upper']
+
+        if bc == BC.custom:
+            self.user_aux_bc_upper(state,dim,t,auxbc,num_ghost)
+        elif bc == BC.extrap:
+            auxbc[ghost] = auxbc[extrap]
+        elif bc == BC.periodic:
             # This process owns the whole patch
-            auxbc[:,-self.num_ghost:,...] = auxbc[:,self.num_ghost:2*self.num_ghost,...]
-        elif self.aux_bc_upper[idim] == BC.wall:
-            for i in xrange(self.num_ghost):
-                auxbc[:,-i-1,...] = auxbc[:,-2*self.num_ghost+i,...]
-        elif self.aux_bc_lower[idim] is None:
-            raise Exception("One or more of the aux boundary conditions aux_bc_lower has not been specified.")
+            auxbc[ghost] = auxbc[periodic]
+        elif bc == BC.wall:
+            auxbc[ghost] = auxbc[wall]
+        elif bc is None:
+            raise Exception("One or more of the aux boundary conditions aux_bc_upper has not been specified.")
         else:
-            raise NotImplementedError("Boundary condition %s not implemented" % self.aux_bc_lower)
+            raise NotImplementedError("Boundary condition %s not implemented" % bc)
 
 
     # ========================================================================
@@ -188,15 +188,15 @@ def check_diff(expected, test, **kwargs):
     This function expects either the keyword argument 'abstol' or 'reltol'.
     """
     err_norm = np.linalg.norm(expected - test)
-    expected_norm = np.linalg.norm(expected)
-    test_norm = np.linalg.norm(test)
+    # The other norms are only computed when they are needed
     if 'abstol' in kwargs:
         if err_norm < kwargs['abstol']: return None
-        else: return (expected_norm, test_norm, err_norm,
+        else: return (np.linalg.norm(expected), np.linalg.norm(test), err_norm,
                       'abstol  : %s' % kwargs['abstol'])
     elif 'reltol' in kwargs:
+        expected_norm = np.linalg.norm(expected)
         if err_norm/expected_norm < kwargs['reltol']: return None
-        else: return (expected_norm, test_norm, err_norm,
+        else: return (expected_norm, np.linalg.norm(test), err_norm,
                       'reltol  : %s' % kwargs['reltol'])
     else:
         raise Exception('Incorrect use of check_diff verifier, specify tol!')